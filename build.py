@@ -0,0 +1,32 @@
+"""Optional Cython build for the modules on the Router Advertisement path.
+
+Poetry calls ``build(setup_kwargs)`` from its generated setup.py. Cython
+is a build requirement, so isolated builds always compile; a build run
+without isolation and without Cython installs as plain Python and the
+``.py`` modules are used unchanged.
+"""
+
+from typing import Any
+
+COMPILED_MODULES = [
+    "route_listener/scapy_handler.py",
+    "route_listener/packet_parser.py",
+    "route_listener/route_configurator.py",
+]
+
+
+def build(setup_kwargs: dict[str, Any]) -> None:
+    """Add the compiled extension modules to the setup arguments.
+
+    Args:
+        setup_kwargs: Keyword arguments Poetry passes to setuptools.setup()
+    """
+    try:
+        from Cython.Build import cythonize
+    except ImportError:
+        return
+
+    setup_kwargs["ext_modules"] = cythonize(
+        COMPILED_MODULES,
+        compiler_directives={"language_level": 3, "binding": True, "annotation_typing": False},
+    )
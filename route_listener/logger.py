@@ -1,54 +1,165 @@
 """Logging module for the route listener."""
 
 import logging
+import os
 import sys
+import time
+from collections.abc import Callable
+from typing import TextIO
 from logging.handlers import RotatingFileHandler
 
-class Logger:
-    """Custom logger for the route listener application."""
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders each wall-clock second's timestamp only once."""
     
-    def __init__(self, verbose: bool = False, log_file: str = "route_listener.log"):
-        """Initialize the logger.
+    def __init__(self, fmt: str, datefmt: str):
+        """Initialize the formatter.
         
         Args:
-            verbose: Whether to enable verbose logging output
-            log_file: Path to the log file (default: route_listener.log)
+            fmt: The record format string
+            datefmt: The strftime format for the timestamp
         """
-        self.verbose = verbose
-        self.log_file = log_file
-        self._setup_logging()
+        super().__init__(fmt, datefmt=datefmt)
+        # (epoch second, formatted timestamp); replaced as a whole so concurrent
+        # handlers never see a second paired with another second's string
+        self._cached_time = (-1, "")
         
-    def _setup_logging(self):
-        """Set up the logging configuration."""
-        # Create a formatter
-        formatter = logging.Formatter('[%(asctime)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        """Return the record's timestamp, reusing the string for the same second.
         
-        # Create a console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
+        Args:
+            record: The log record being formatted
+            datefmt: Ignored; the format given at construction is used
+            
+        Returns:
+            The formatted timestamp
+        """
+        second = int(record.created)
+        cached = self._cached_time
+        if cached[0] != second:
+            datefmt = self.datefmt or self.default_time_format
+            cached = (second, time.strftime(datefmt, self.converter(second)))
+            self._cached_time = cached
+        return cached[1]
+
+class _FdStreamHandler(logging.StreamHandler):
+    """Console handler that writes each record straight to the stream's file descriptor."""
+    
+    def __init__(self, stream: TextIO) -> None:
+        """Initialize the handler.
         
-        # Create a file handler with 100KB size limit
-        file_handler = RotatingFileHandler(
-            self.log_file,
-            maxBytes=100 * 1024,  # 100KB
-            backupCount=3,  # Keep 3 backup files
-            encoding='utf-8'
-        )
-        file_handler.setFormatter(formatter)
+        Args:
+            stream: Text stream backed by a real file descriptor (e.g. sys.stdout)
+            
+        Raises:
+            OSError: If the stream has no usable file descriptor
+        """
+        super().__init__(stream)
+        self._fd = stream.fileno()
+        # Push out anything already buffered so lines stay in order
+        stream.flush()
         
-        # Create a logger
-        self._logger = logging.getLogger('route_listener')
-        self._logger.setLevel(logging.DEBUG)  # Set to DEBUG by default
+    def emit(self, record: logging.LogRecord) -> None:
+        """Encode the formatted record and write it with os.write.
         
-        # Remove any existing handlers
-        self._logger.handlers = []
+        Args:
+            record: The log record to emit
+        """
+        try:
+            data = memoryview((self.format(record) + self.terminator).encode("utf-8"))
+            while data:
+                data = data[os.write(self._fd, data):]
+        except Exception:
+            self.handleError(record)
+
+class Lazy:
+    """Log argument that is only computed if the message is actually formatted.
+    
+    Wraps a call such as ``packet.summary`` so that passing it to a debug
+    message costs nothing while debug output is off.
+    """
+    
+    __slots__ = ("_args", "_func", "_kwargs")
+    
+    def __init__(self, func: Callable[..., object], *args: object, **kwargs: object) -> None:
+        """Initialize the lazy argument.
         
-        # Add handlers
-        self._logger.addHandler(console_handler)
-        self._logger.addHandler(file_handler)
+        Args:
+            func: Callable producing the value to log
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        """
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
         
-        # Log startup message
-        self._logger.info(f"Logging initialized. Console output enabled. File logging to {self.log_file} (100KB limit)")
+    def __str__(self) -> str:
+        """Call the wrapped function and return its result as a string."""
+        return str(self._func(*self._args, **self._kwargs))
+
+LOGGER_NAME = "route_listener"
+
+# Set once the shared logger has its handlers attached
+_configured = False
+
+def _configure_once(log_file: str) -> None:
+    """Attach the console and file handlers to the shared logger, once per process.
+    
+    Later calls are no-ops, so creating several Logger instances neither
+    duplicates output nor reopens the log file.
+    
+    Args:
+        log_file: Path to the log file
+    """
+    global _configured
+    if _configured:
+        return
+    
+    # Create a formatter
+    formatter = _CachedTimeFormatter('[%(asctime)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    
+    # Create a console handler, writing to the fd directly when there is one
+    console_handler: logging.StreamHandler
+    try:
+        console_handler = _FdStreamHandler(sys.stdout)
+    except (AttributeError, OSError, ValueError):
+        console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    
+    # Create a file handler with 100KB size limit
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=100 * 1024,  # 100KB
+        backupCount=3,  # Keep 3 backup files
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(formatter)
+    
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(logging.DEBUG)  # Set to DEBUG by default
+    logger.handlers = [console_handler, file_handler]
+    _configured = True
+    
+    # Log startup message
+    logger.info(
+        "Logging initialized. Console output enabled. File logging to %s (100KB limit)",
+        log_file,
+    )
+
+class Logger:
+    """Custom logger for the route listener application."""
+    
+    def __init__(self, verbose: bool = False, log_file: str = "route_listener.log"):
+        """Initialize the logger.
+        
+        Args:
+            verbose: Whether to enable verbose logging output
+            log_file: Path to the log file (default: route_listener.log); only the
+                first Logger created in the process sets up the file handler
+        """
+        self.verbose = verbose
+        self.log_file = log_file
+        self._logger = logging.getLogger(LOGGER_NAME)
+        _configure_once(log_file)
         
     def setLevel(self, level: int) -> None:
         """Set the logging level.
@@ -58,45 +169,67 @@ class Logger:
         """
         self._logger.setLevel(level)
         
-    def info(self, message: str) -> None:
+    def info(self, message: str, *args: object) -> None:
         """Log an info message.
         
         Args:
-            message: The message to log
+            message: The message to log, with optional %-style placeholders
+            *args: Arguments merged into the message only if it is emitted
         """
-        self._logger.info(message)
+        self._logger.info(message, *args)
         
-    def error(self, message: str) -> None:
+    def error(self, message: str, *args: object) -> None:
         """Log an error message.
         
         Args:
-            message: The message to log
+            message: The message to log, with optional %-style placeholders
+            *args: Arguments merged into the message only if it is emitted
+        """
+        self._logger.error(message, *args)
+        
+    def warning(self, message: str, *args: object) -> None:
+        """Log a warning message.
+        
+        Args:
+            message: The message to log, with optional %-style placeholders
+            *args: Arguments merged into the message only if it is emitted
         """
-        self._logger.error(message)
+        self._logger.warning(message, *args)
         
-    def debug(self, message: str) -> None:
+    def debug(self, message: str, *args: object) -> None:
         """Log a debug message.
         
         Args:
-            message: The message to log
+            message: The message to log, with optional %-style placeholders
+            *args: Arguments merged into the message only if it is emitted
         """
-        if self.verbose:
-            self._logger.debug(message)
+        if self.isEnabledFor(logging.DEBUG):
+            self._logger.debug(message, *args)
         
     def isEnabledFor(self, level: int) -> bool:
         """Check if the logger is enabled for the given level.
         
+        Debug messages are only emitted in verbose mode, so callers can use
+        this to skip building expensive debug arguments altogether.
+        
         Args:
             level: The logging level to check
             
         Returns:
             True if the logger is enabled for the given level, False otherwise
         """
+        if level <= logging.DEBUG and not self.verbose:
+            return False
         return self._logger.isEnabledFor(level)
 
     def banner(self, message: str) -> None:
-        """Log a banner message."""
-        self._logger.info(message)
+        """Print a banner to the console without a timestamp prefix.
+        
+        Args:
+            message: The banner text
+        """
+        sys.stdout.write(message + "\n")
+        sys.stdout.flush()
 
     def packet_info(self, src_addr: str, prefix: str, prefix_len: int, router: str = None) -> None:
         """Log basic packet information in a single line.
@@ -110,8 +243,10 @@ class Logger:
         if not self.verbose:
             return
             
-        router_str = f" via {router}" if router and router != src_addr else ""
-        self._logger.info(f"🔔 RA from {src_addr}: {prefix}/{prefix_len}{router_str}")
+        if router and router != src_addr:
+            self._logger.info("🔔 RA from %s: %s/%s via %s", src_addr, prefix, prefix_len, router)
+        else:
+            self._logger.info("🔔 RA from %s: %s/%s", src_addr, prefix, prefix_len)
 
     def ignored_route(self, prefix: str, prefix_len: int, reason: str) -> None:
         """Log ignored route information in a single line.
@@ -122,4 +257,4 @@ class Logger:
             reason: The reason for ignoring the route
         """
         if self.verbose:
-            self._logger.info(f"⏭️  Ignored {prefix}/{prefix_len}: {reason}") 
\ No newline at end of file
+            self._logger.info("⏭️  Ignored %s/%s: %s", prefix, prefix_len, reason) 
\ No newline at end of file
@@ -13,6 +13,15 @@ from .scapy_handler import ScapyPacketHandler
 VERSION = "0.1.0"
 BUILD_NUMBER = "4"
 
+BANNER = f"""
+╔════════════════════════════════════════════════════════════════════════════╗
+║                     🚀 ICMPv6 RA Listener v{VERSION} (build={BUILD_NUMBER})                          ║
+║                                                                          ║
+║  Monitors Thread Border Routers for IPv6 Router Advertisements           ║
+║  and displays ULA prefixes and routes for network configuration          ║
+╚════════════════════════════════════════════════════════════════════════════╝
+"""
+
 def main():
     """Main entry point for the application."""
     # Parse command line arguments
@@ -32,23 +41,26 @@ def main():
         logger.debug("Debug logging enabled")
     
     # Display banner
-    logger.banner(f"""
-╔════════════════════════════════════════════════════════════════════════════╗
-║                     🚀 ICMPv6 RA Listener v{VERSION} (build={BUILD_NUMBER})                          ║
-║                                                                          ║
-║  Monitors Thread Border Routers for IPv6 Router Advertisements           ║
-║  and displays ULA prefixes and routes for network configuration          ║
-╚════════════════════════════════════════════════════════════════════════════╝
-""")
+    logger.banner(BANNER)
     
     # Display system information
     logger.info("🔍 System Information:")
-    logger.info(f"  Python version: {platform.python_version()} ({platform.python_implementation()}, {platform.python_compiler()})")
-    logger.info(f"  Scapy version: {conf.version}")
-    logger.info(f"  Debug logging: {'Yes' if args.debug else 'No'}")
-    logger.info(f"  Verbose mode: {'Yes' if args.verbose else 'No'}")
-    logger.info(f"  Available interfaces: {', '.join(get_if_list())}")
-    logger.info(f"  Router Solicitation: {'Enabled' if args.enable_rs else 'Disabled'}")
+    logger.info(
+        "  Python version: %s (%s, %s)",
+        platform.python_version(),
+        platform.python_implementation(),
+        platform.python_compiler(),
+    )
+    logger.info("  Scapy version: %s", conf.version)
+    logger.info("  Debug logging: %s", "Yes" if args.debug else "No")
+    logger.info("  Verbose mode: %s", "Yes" if args.verbose else "No")
+    logger.info("  Available interfaces: %s", ", ".join(get_if_list()))
+    logger.info("  Router Solicitation: %s", "Enabled" if args.enable_rs else "Disabled")
+    
+    # Only the fallback Scapy sniffer uses this: capturing through libpcap lets
+    # it compile its RA filter into the kernel. The packet socket attaches its
+    # own BPF program
+    conf.use_pcap = True
     
     # Initialize route configurator
     configurator = RouteConfigurator(logger, interface=args.interface)
@@ -5,6 +5,14 @@ from scapy.all import (
     ICMPv6NDOptPrefixInfo,
     ICMPv6NDOptRouteInfo,
 )
+from .route_configurator import is_ula_prefix
+
+# Option type -> (is_prefix, name of its prefix length field, label for logs);
+# Route Info uses 'plen' instead of 'prefixlen'
+_OPTION_FIELDS = {
+    ICMPv6NDOptPrefixInfo: (True, "prefixlen", "prefix"),
+    ICMPv6NDOptRouteInfo: (False, "plen", "route"),
+}
 
 class PacketFilter:
     """Handles filtering logic for Router Advertisement packets."""
@@ -41,36 +49,13 @@ class PacketFilter:
             # Track if we found any new routes to process
             found_new = False
 
-            # Check for ULA prefixes or routes
-            for opt in ra.payload:
-                if isinstance(opt, ICMPv6NDOptPrefixInfo):
-                    try:
-                        prefix_str = str(opt.prefix)
-                        prefix_len = opt.prefixlen
-                        if prefix_str.startswith("fd"):
-                            # Check if this prefix is already configured
-                            if not self.route_configurator.is_configured(prefix_str, prefix_len, is_prefix=True):
-                                found_new = True
-                            elif not self.initial_check_done and logger:
-                                logger.info(f"✓ ULA prefix already configured: {prefix_str}/{prefix_len}")
-                            elif logger and logger.verbose:
-                                logger.debug(f"⏭️  ULA prefix already configured: {prefix_str}/{prefix_len}")
-                    except AttributeError:
-                        continue
-                elif isinstance(opt, ICMPv6NDOptRouteInfo):
-                    try:
-                        prefix_str = str(opt.prefix)
-                        prefix_len = opt.plen  # Route Info uses 'plen' instead of 'prefixlen'
-                        if prefix_str.startswith("fd"):
-                            # Check if this route is already configured
-                            if not self.route_configurator.is_configured(prefix_str, prefix_len, is_prefix=False):
-                                found_new = True
-                            elif not self.initial_check_done and logger:
-                                logger.info(f"✓ ULA route already configured: {prefix_str}/{prefix_len}")
-                            elif logger and logger.verbose:
-                                logger.debug(f"⏭️  ULA route already configured: {prefix_str}/{prefix_len}")
-                    except AttributeError:
-                        continue
+            # Check for ULA prefixes or routes, walking the option chain
+            opt = ra.payload
+            while opt:
+                fields = _OPTION_FIELDS.get(type(opt))
+                if fields is not None and self._is_new_ula(opt, *fields, logger):
+                    found_new = True
+                opt = opt.payload
 
             # Mark initial check as done after first packet
             self.initial_check_done = True
@@ -80,5 +65,33 @@ class PacketFilter:
             
         except Exception as e:
             if logger and logger.verbose:
-                logger.error(f"Error checking packet: {str(e)}")
-            return False 
\ No newline at end of file
+                logger.error("Error checking packet: %s", e)
+            return False 
+
+    def _is_new_ula(self, opt, is_prefix, length_field, label, logger=None):
+        """Check whether an option carries a ULA prefix that is not yet configured.
+        
+        Args:
+            opt: The Prefix or Route Information option
+            is_prefix: Whether the option is an on-link prefix
+            length_field: Name of the option's prefix length field
+            label: Option kind used in log messages
+            logger: Optional logger instance for debug output
+            
+        Returns:
+            bool: True if the option holds a new ULA prefix, False otherwise
+        """
+        try:
+            prefix_str = str(opt.prefix)
+            prefix_len = getattr(opt, length_field)
+        except AttributeError:
+            return False
+        if not is_ula_prefix(prefix_str):
+            return False
+        if not self.route_configurator.is_configured(prefix_str, prefix_len, is_prefix=is_prefix):
+            return True
+        if not self.initial_check_done and logger:
+            logger.info("✓ ULA %s already configured: %s/%s", label, prefix_str, prefix_len)
+        elif logger:
+            logger.debug("⏭️  ULA %s already configured: %s/%s", label, prefix_str, prefix_len)
+        return False
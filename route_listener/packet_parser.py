@@ -1,6 +1,31 @@
 """Packet parsing for Router Advertisements."""
 
+import logging
+import socket
+import struct
 from scapy.all import IPv6, ICMPv6ND_RA, ICMPv6NDOptPrefixInfo, ICMPv6NDOptRouteInfo
+from .logger import Lazy
+from .route_configurator import is_ula_packed, is_ula_prefix
+
+# Offsets into an Ethernet frame carrying an IPv6 packet without extension headers
+ETHERTYPE_OFFSET = 12
+PAYLOAD_LEN_OFFSET = 18
+NEXT_HEADER_OFFSET = 20
+SRC_ADDR_OFFSET = 22
+ICMPV6_OFFSET = 54
+
+ETH_P_IPV6 = 0x86DD
+IPPROTO_ICMPV6 = 58
+ND_ROUTER_ADVERT = 134
+
+# RA header (type, code, checksum, hop limit, flags, router lifetime,
+# reachable time, retrans timer) is followed by TLV options in 8-byte units
+RA_HEADER_LEN = 16
+ND_OPT_PREFIX_INFORMATION = 3
+ND_OPT_ROUTE_INFORMATION = 24
+
+_PREFIX_OPT = struct.Struct("!BBBBII4x16s")
+_ROUTE_OPT = struct.Struct("!BBBBI")
 
 class PacketParser:
     """Handles parsing of Router Advertisement packets."""
@@ -12,12 +37,18 @@ class PacketParser:
             logger: Optional logger instance for debug output
         """
         self.logger = logger
+        self._option_handlers = {
+            ICMPv6NDOptPrefixInfo: self._process_prefix_option,
+            ICMPv6NDOptRouteInfo: self._process_route_option,
+        }
 
-    def parse(self, packet):
+    def parse(self, packet, ra=None, src_addr=None):
         """Parse a Router Advertisement packet.
         
         Args:
             packet: The packet to parse
+            ra: The packet's ICMPv6ND_RA layer, if the caller already looked it up
+            src_addr: The packet's IPv6 source address, required with ra
             
         Returns:
             dict: Dictionary containing packet information:
@@ -29,53 +60,156 @@ class PacketParser:
             Exception: If the packet is malformed or contains invalid options
         """
         try:
-            # Ensure we have an IPv6 packet
-            if not IPv6 in packet:
-                if self.logger and self.logger.verbose:
-                    self.logger.debug("⏭️  Ignoring non-IPv6 packet")
-                return {}
-                
-            # Check if it's a Router Advertisement
-            if not ICMPv6ND_RA in packet:
-                if self.logger and self.logger.verbose:
-                    self.logger.debug("⏭️  Ignoring non-RA packet")
-                return {}
-                
-            src_addr = packet[IPv6].src
-            
-            # Get the Router Advertisement layer
-            ra = packet[ICMPv6ND_RA]
+            # Look each layer up once, unless the caller already did;
+            # getlayer returns None when it is absent
+            if ra is None:
+                ipv6 = packet.getlayer(IPv6)
+                if ipv6 is None:
+                    if self.logger and self.logger.verbose:
+                        self.logger.debug("⏭️  Ignoring non-IPv6 packet")
+                    return {}
+                    
+                ra = packet.getlayer(ICMPv6ND_RA)
+                if ra is None:
+                    if self.logger and self.logger.verbose:
+                        self.logger.debug("⏭️  Ignoring non-RA packet")
+                    return {}
+                    
+                src_addr = ipv6.src
             
-            # Now we can log the packet details if in debug mode
-            if self.logger and self.logger.verbose:
-                self.logger.debug(f"🔍 Raw RA data: {ra.show()}")
-                self.logger.debug(f"🔍 RA options: {ra.payload}")
+            # Dumping the layers is costly, so only do it if the message is emitted
+            if self.logger:
+                self.logger.debug("🔍 Raw RA data: %s", Lazy(ra.show, dump=True))
+                self.logger.debug("🔍 RA options: %s", ra.payload)
             
             # Initialize packet info dictionary
             packet_info = {
                 "src_ip": src_addr
             }
             
-            # Get all options from the RA packet
-            options = ra.payload if hasattr(ra, 'payload') else []
-            if isinstance(options, list):
-                # If options is a list, process each option
-                for opt in options:
-                    self._process_option(opt, packet_info)
+            # A captured RA still carries its wire bytes, so decode the options
+            # from those; otherwise walk the option chain, which scapy
+            # terminates with a falsy NoPayload
+            if ra.original:
+                self._parse_options(ra.original, RA_HEADER_LEN, len(ra.original), packet_info)
             else:
-                # If options is a single option or chain, process it
-                opt = options
-                while opt and not isinstance(opt, bytes):
+                opt = ra.payload
+                while opt:
                     self._process_option(opt, packet_info)
-                    opt = opt.payload if hasattr(opt, 'payload') else None
+                    opt = opt.payload
             
             return packet_info
                     
         except Exception as e:
             if self.logger and self.logger.verbose:
-                self.logger.error(f"Error parsing packet: {str(e)}")
+                self.logger.error("Error parsing packet: %s", e)
             raise
                 
+    def ra_source(self, frame):
+        """Locate the Router Advertisement in a raw frame.
+        
+        Args:
+            frame: Ethernet frame as bytes or memoryview
+            
+        Returns:
+            tuple: (source address, offset just past the RA), bounded by the
+                IPv6 Payload Length so padding or trailers are excluded; None if
+                the frame is not a complete ICMPv6 RA
+        """
+        if len(frame) < ICMPV6_OFFSET + RA_HEADER_LEN:
+            return None
+        if (
+            frame[ETHERTYPE_OFFSET] << 8 | frame[ETHERTYPE_OFFSET + 1]
+        ) != ETH_P_IPV6:
+            return None
+        if frame[NEXT_HEADER_OFFSET] != IPPROTO_ICMPV6 or frame[ICMPV6_OFFSET] != ND_ROUTER_ADVERT:
+            return None
+        payload_len = frame[PAYLOAD_LEN_OFFSET] << 8 | frame[PAYLOAD_LEN_OFFSET + 1]
+        ra_end = ICMPV6_OFFSET + payload_len
+        if payload_len < RA_HEADER_LEN or ra_end > len(frame):
+            return None
+        src_addr = socket.inet_ntop(
+            socket.AF_INET6, bytes(frame[SRC_ADDR_OFFSET:SRC_ADDR_OFFSET + 16])
+        )
+        return src_addr, ra_end
+
+    def parse_frame(self, frame, located=None):
+        """Parse a raw Router Advertisement frame without Scapy dissection.
+        
+        Produces the same dictionary as parse() by walking the option TLVs
+        directly and decoding only Prefix and Route Information options.
+        
+        Args:
+            frame: Ethernet frame as bytes or memoryview
+            located: The (source address, RA end) pair from ra_source(), if
+                the caller already has it
+            
+        Returns:
+            dict: Packet information as returned by parse(), or an empty dict
+                if the frame is not an ICMPv6 Router Advertisement
+                
+        Raises:
+            ValueError: If an option is truncated or has a zero length
+        """
+        if located is None:
+            located = self.ra_source(frame)
+        if located is None:
+            if self.logger and self.logger.verbose:
+                self.logger.debug("⏭️  Ignoring non-RA frame")
+            return {}
+        src_addr, ra_end = located
+        
+        packet_info = {
+            "src_ip": src_addr
+        }
+        self._parse_options(frame, ICMPV6_OFFSET + RA_HEADER_LEN, ra_end, packet_info)
+        return packet_info
+
+    def _parse_options(self, buf, off, end, packet_info):
+        """Decode the RA option TLVs in a buffer.
+        
+        Args:
+            buf: Bytes or memoryview holding the RA
+            off: Offset of the first option in buf
+            end: Offset just past the last option in buf
+            packet_info: Dictionary to store the parsed information
+            
+        Raises:
+            ValueError: If an option is truncated or has a zero length
+        """
+        while off + 2 <= end:
+            opt_type = buf[off]
+            opt_len = buf[off + 1] * 8
+            if opt_len == 0 or off + opt_len > end:
+                raise ValueError(f"Malformed option type {opt_type} at offset {off}")
+            
+            if opt_type == ND_OPT_PREFIX_INFORMATION:
+                if opt_len < _PREFIX_OPT.size:
+                    raise ValueError("Prefix option is truncated")
+                _, _, prefix_len, _, valid_time, pref_time, prefix = _PREFIX_OPT.unpack_from(
+                    buf, off
+                )
+                self._add_prefix(packet_info, {
+                    "address": socket.inet_ntop(socket.AF_INET6, prefix),
+                    "length": prefix_len,
+                    "valid_time": valid_time,
+                    "pref_time": pref_time,
+                    "ula": is_ula_packed(prefix),
+                })
+            elif opt_type == ND_OPT_ROUTE_INFORMATION:
+                _, _, prefix_len, _, lifetime = _ROUTE_OPT.unpack_from(buf, off)
+                # RFC 4191: the prefix field is 0, 8 or 16 bytes, zero-padded here
+                prefix = bytes(buf[off + _ROUTE_OPT.size:off + opt_len]).ljust(16, b"\0")
+                self._add_route(packet_info, {
+                    "address": socket.inet_ntop(socket.AF_INET6, prefix),
+                    "length": prefix_len,
+                    "lifetime": lifetime,
+                    "ula": is_ula_packed(prefix),
+                })
+            elif self.logger and self.logger.verbose:
+                self.logger.debug("⏭️  Ignoring option type: %s", opt_type)
+            off += opt_len
+
     def _process_option(self, opt, packet_info):
         """Process a single RA option.
         
@@ -86,53 +220,100 @@ class PacketParser:
         Raises:
             Exception: If the option is malformed or contains invalid data
         """
+        # The option's fields are already in the RA dump logged by parse()
+        if self.logger and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("🔍 Processing option: %s", type(opt).__name__)
+        
+        handler = self._option_handlers.get(type(opt))
+        if handler is not None:
+            handler(opt, packet_info)
+        elif self.logger and self.logger.verbose:
+            self.logger.debug("⏭️  Ignoring option type: %s", type(opt).__name__)
+
+    def _process_prefix_option(self, opt, packet_info):
+        """Process a Prefix Information option.
+        
+        Args:
+            opt: The ICMPv6NDOptPrefixInfo option
+            packet_info: Dictionary to store the parsed information
+            
+        Raises:
+            ValueError: If a required field is missing
+        """
+        # Check for None values
+        if opt.prefix is None:
+            raise ValueError("Prefix option has None prefix")
+        if opt.prefixlen is None:
+            raise ValueError("Prefix option has None prefixlen")
+        if opt.validlifetime is None:
+            raise ValueError("Prefix option has None validlifetime")
+        if opt.preferredlifetime is None:
+            raise ValueError("Prefix option has None preferredlifetime")
+            
+        prefix_str = str(opt.prefix)
+        self._add_prefix(packet_info, {
+            "address": prefix_str,
+            "length": opt.prefixlen,
+            "valid_time": opt.validlifetime,
+            "pref_time": opt.preferredlifetime,
+            "ula": is_ula_prefix(prefix_str),
+        })
+
+    def _process_route_option(self, opt, packet_info):
+        """Process a Route Information option.
+        
+        Args:
+            opt: The ICMPv6NDOptRouteInfo option
+            packet_info: Dictionary to store the parsed information
+            
+        Raises:
+            ValueError: If a required field is missing
+        """
+        # Check for None values
+        if opt.prefix is None:
+            raise ValueError("Route option has None prefix")
+        if opt.plen is None:
+            raise ValueError("Route option has None plen")
+        if opt.rtlifetime is None:
+            raise ValueError("Route option has None rtlifetime")
+            
+        # Route Info uses 'plen' instead of 'prefixlen'
+        prefix_str = str(opt.prefix)
+        self._add_route(packet_info, {
+            "address": prefix_str,
+            "length": opt.plen,
+            "lifetime": opt.rtlifetime,
+            "ula": is_ula_prefix(prefix_str),
+        })
+
+    def _add_prefix(self, packet_info, prefix):
+        """Record an on-link prefix in the packet information.
+        
+        Args:
+            packet_info: Dictionary to store the parsed information
+            prefix: Prefix option fields: address, length, valid_time,
+                pref_time and ula (whether the prefix is a ULA prefix)
+        """
         if self.logger and self.logger.verbose:
-            self.logger.debug(f"🔍 Processing option: {type(opt).__name__}")
-            self.logger.debug(f"🔍 Option data: {opt.show()}")
+            address, length = prefix["address"], prefix["length"]
+            self.logger.debug("🔍 Found on-link prefix: %s/%s", address, length)
+            self.logger.info("📡 On-link prefix: %s/%s (directly connected)", address, length)
+        prefix["on_link"] = True
+        prefix["autonomous"] = True
+        packet_info["prefix"] = prefix
+
+    def _add_route(self, packet_info, route):
+        """Record an off-link route in the packet information.
         
-        if isinstance(opt, ICMPv6NDOptPrefixInfo):
-            # Check for None values
-            if opt.prefix is None:
-                raise ValueError("Prefix option has None prefix")
-            if opt.prefixlen is None:
-                raise ValueError("Prefix option has None prefixlen")
-            if opt.validlifetime is None:
-                raise ValueError("Prefix option has None validlifetime")
-            if opt.preferredlifetime is None:
-                raise ValueError("Prefix option has None preferredlifetime")
-                
-            prefix_str = str(opt.prefix)
-            prefix_len = opt.prefixlen
-            if self.logger and self.logger.verbose:
-                self.logger.debug(f"🔍 Found on-link prefix: {prefix_str}/{prefix_len}")
-                self.logger.info(f"📡 On-link prefix: {prefix_str}/{prefix_len} (directly connected)")
-            packet_info["prefix"] = {
-                "address": prefix_str,
-                "length": prefix_len,
-                "on_link": True,
-                "autonomous": True,
-                "valid_time": opt.validlifetime,
-                "pref_time": opt.preferredlifetime
-            }
-        elif isinstance(opt, ICMPv6NDOptRouteInfo):
-            # Check for None values
-            if opt.prefix is None:
-                raise ValueError("Route option has None prefix")
-            if opt.plen is None:
-                raise ValueError("Route option has None plen")
-            if opt.rtlifetime is None:
-                raise ValueError("Route option has None rtlifetime")
-                
-            prefix_str = str(opt.prefix)
-            prefix_len = opt.plen  # Route Info uses 'plen' instead of 'prefixlen'
-            if self.logger and self.logger.verbose:
-                self.logger.debug(f"🔍 Found off-link route: {prefix_str}/{prefix_len}")
-                self.logger.info(f"🛣️  Off-link route: {prefix_str}/{prefix_len} (via {packet_info['src_ip']})")
-            packet_info["route"] = {
-                "address": prefix_str,
-                "length": prefix_len,
-                "lifetime": opt.rtlifetime
-            }
-        else:
-            if self.logger and self.logger.verbose:
-                self.logger.debug(f"⏭️  Ignoring option type: {type(opt).__name__}") 
\ No newline at end of file
+        Args:
+            packet_info: Dictionary to store the parsed information
+            route: Route option fields: address, length, lifetime and ula
+                (whether the route prefix is a ULA prefix)
+        """
+        if self.logger and self.logger.verbose:
+            address, length = route["address"], route["length"]
+            self.logger.debug("🔍 Found off-link route: %s/%s", address, length)
+            self.logger.info(
+                "🛣️  Off-link route: %s/%s (via %s)", address, length, packet_info["src_ip"]
+            )
+        packet_info["route"] = route
\ No newline at end of file
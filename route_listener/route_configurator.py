@@ -1,11 +1,67 @@
 """Route configuration module for IPv6 routes."""
 
 import os
+import socket
 import subprocess
+from collections import OrderedDict
 from dataclasses import dataclass
 from .logger import Logger
 
-@dataclass
+try:
+    from pyroute2 import IPRoute
+except ImportError:  # pyroute2 is optional; routes are then set up by the script
+    IPRoute = None
+
+# First byte of every address in the ULA range actually used (fd00::/8)
+ULA_FIRST_BYTE = 0xFD
+
+# Next-hop flag from linux/rtnetlink.h: treat the gateway as directly reachable
+RTNH_F_ONLINK = 4
+
+def is_ula_packed(packed: bytes) -> bool:
+    """Check if a packed 16-byte IPv6 address lies in fd00::/8.
+    
+    Only the locally assigned half of fc00::/7 is in use, so a single
+    first-byte comparison decides.
+    
+    Args:
+        packed: Address in network byte order, e.g. from inet_pton
+        
+    Returns:
+        bool: True if the address is a ULA address, False otherwise
+    """
+    return packed[0] == ULA_FIRST_BYTE
+
+def is_ula_prefix(prefix: str) -> bool:
+    """Check if an IPv6 prefix is a ULA prefix (fd00::/8).
+    
+    Args:
+        prefix: IPv6 prefix, with or without a /length suffix
+        
+    Returns:
+        bool: True if the prefix is a ULA prefix, False otherwise (including malformed input)
+    """
+    try:
+        packed = socket.inet_pton(socket.AF_INET6, prefix.partition("/")[0])
+    except OSError:
+        return False
+    return is_ula_packed(packed)
+
+def make_route_key(prefix: str, router: str, interface: str, is_prefix: bool) -> tuple:
+    """Build the key that identifies a configured route.
+    
+    Args:
+        prefix: IPv6 prefix, with or without a /length suffix
+        router: Router address (may be None)
+        interface: Network interface
+        is_prefix: Whether this is a prefix (on-link) or route (off-link)
+        
+    Returns:
+        tuple: Hashable key, equal for routes that only differ in prefix length notation
+    """
+    return (prefix.partition("/")[0], router, interface, is_prefix)
+
+@dataclass(slots=True, frozen=True)
 class Route:
     """Represents an IPv6 route."""
     prefix: str
@@ -17,14 +73,12 @@ class Route:
         return f"{self.prefix} via {self.router} ({'prefix' if self.is_prefix else 'route'})"
 
     def is_ula(self) -> bool:
-        """Check if this is a ULA prefix (starts with 'fd')."""
-        return self.prefix.startswith("fd")
+        """Check if this is a ULA prefix (fd00::/8)."""
+        return is_ula_prefix(self.prefix)
     
-    def get_route_key(self) -> str:
+    def get_route_key(self) -> tuple:
         """Get a unique key for this route."""
-        # Remove any existing prefix length notation
-        base_prefix = self.prefix.split('/')[0]
-        return f"{base_prefix}|{self.router}|{self.interface}|{self.is_prefix}"
+        return make_route_key(self.prefix, self.router, self.interface, self.is_prefix)
 
 class RouteExecutor:
     """Handles the actual execution of route configuration commands."""
@@ -39,10 +93,95 @@ class RouteExecutor:
         self.logger = logger
         self.interface = interface
         self.script_path = os.path.join(os.path.dirname(__file__), "..", "bin", "configure-ipv6-route.sh")
+        # Snapshot the process environment once; os.environ.copy() re-decodes every entry
+        self._base_env = dict(os.environ)
+        self.ipr = self._open_netlink()
+        
+    def _open_netlink(self):
+        """Open a netlink route socket if pyroute2 is available.
+        
+        Returns:
+            An IPRoute instance, or None if netlink cannot be used
+        """
+        if IPRoute is None:
+            return None
+        try:
+            return IPRoute()
+        except Exception as e:
+            self.logger.debug("Netlink unavailable, using script: %s", e)
+            return None
         
     def execute(self, route: Route, prefix_len: int) -> bool:
         """Execute the route configuration command.
         
+        Routes are installed over netlink when possible; the shell script is used
+        when pyroute2 is missing or the netlink request fails.
+        
+        Args:
+            route: The route to configure
+            prefix_len: Prefix length
+            
+        Returns:
+            bool: True if configuration was successful, False otherwise
+        """
+        if self.ipr is not None and route.router:
+            try:
+                self._execute_netlink(route, prefix_len)
+                self.logger.info(
+                    "✅ %s configured successfully: %s/%s via %s dev %s",
+                    "Prefix" if route.is_prefix else "Route",
+                    route.prefix,
+                    prefix_len,
+                    route.router,
+                    self.interface,
+                )
+                return True
+            except Exception as e:
+                self.logger.warning("⚠️  Netlink route setup failed, falling back to script: %s", e)
+        return self._execute_script(route, prefix_len)
+        
+    def _execute_netlink(self, route: Route, prefix_len: int) -> None:
+        """Add or replace the route in the kernel over netlink.
+        
+        Routes on the interface for the same base prefix but another prefix
+        length are removed first, as the script does, so the last advertised
+        route wins.
+        
+        Args:
+            route: The route to configure
+            prefix_len: Prefix length
+            
+        Raises:
+            LookupError: If the interface does not exist
+            Exception: Any netlink error reported by pyroute2
+        """
+        # if_nametoindex is a single SIOCGIFINDEX ioctl, no netlink dump needed
+        try:
+            if_index = socket.if_nametoindex(self.interface)
+        except OSError:
+            raise LookupError(f"Interface {self.interface} does not exist") from None
+        base_prefix = route.prefix.partition("/")[0]
+        # "replace" only matches the exact dst/len, so sweep other lengths first
+        for msg in self.ipr.get_routes(family=socket.AF_INET6, oif=if_index):
+            if msg.get_attr("RTA_DST") == base_prefix and msg["dst_len"] != prefix_len:
+                self.ipr.route(
+                    "del",
+                    family=socket.AF_INET6,
+                    dst=f"{base_prefix}/{msg['dst_len']}",
+                    oif=if_index,
+                )
+        self.ipr.route(
+            "replace",
+            family=socket.AF_INET6,
+            dst=f"{base_prefix}/{prefix_len}",
+            gateway=route.router,
+            oif=if_index,
+            flags=RTNH_F_ONLINK if route.is_prefix else 0,
+        )
+        
+    def _execute_script(self, route: Route, prefix_len: int) -> bool:
+        """Run the route configuration script.
+        
         Args:
             route: The route to configure
             prefix_len: Prefix length
@@ -52,7 +191,7 @@ class RouteExecutor:
         """
         try:
             # Set environment variables for the script
-            env = os.environ.copy()
+            env = self._base_env.copy()
             env["PREFIX"] = route.prefix
             env["PREFIX_LEN"] = str(prefix_len)
             env["IFACE"] = self.interface
@@ -61,15 +200,15 @@ class RouteExecutor:
             env["IS_PREFIX"] = "1" if route.is_prefix else "0"
                 
             # Log the parameters before running the script
-            self.logger.info(f"🔍 Running script with parameters:")
-            self.logger.info(f"   PREFIX: {route.prefix}")
-            self.logger.info(f"   PREFIX_LEN: {prefix_len}")
-            self.logger.info(f"   IFACE: {self.interface}")
+            self.logger.info("🔍 Running script with parameters:")
+            self.logger.info("   PREFIX: %s", route.prefix)
+            self.logger.info("   PREFIX_LEN: %s", prefix_len)
+            self.logger.info("   IFACE: %s", self.interface)
             if route.router:
-                self.logger.info(f"   ROUTER: {route.router}")
+                self.logger.info("   ROUTER: %s", route.router)
             else:
                 self.logger.warning("⚠️  No router address provided")
-            self.logger.info(f"   TYPE: {'prefix' if route.is_prefix else 'route'}")
+            self.logger.info("   TYPE: %s", "prefix" if route.is_prefix else "route")
                 
             # Run the script and capture output
             result = subprocess.run(
@@ -81,27 +220,32 @@ class RouteExecutor:
             
             # Check the return code
             if result.returncode == 0:
-                self.logger.info(f"✅ {'Prefix' if route.is_prefix else 'Route'} configured successfully: {result.stdout}")
+                self.logger.info(
+                    "✅ %s configured successfully: %s",
+                    "Prefix" if route.is_prefix else "Route",
+                    result.stdout,
+                )
                 return True
             else:
-                self.logger.error(f"❌ Failed to configure {'prefix' if route.is_prefix else 'route'}: {result.stderr}")
-                if self.logger.verbose:
-                    self.logger.debug(f"Command output: {result.stdout}")
-                    self.logger.debug(f"Command error: {result.stderr}")
-                    self.logger.debug(f"Return code: {result.returncode}")
+                self.logger.error(
+                    "❌ Failed to configure %s: %s",
+                    "prefix" if route.is_prefix else "route",
+                    result.stderr,
+                )
+                self.logger.debug("Command output: %s", result.stdout)
+                self.logger.debug("Command error: %s", result.stderr)
+                self.logger.debug("Return code: %s", result.returncode)
                 return False
             
         except subprocess.CalledProcessError as e:
-            self.logger.error(f"❌ Script execution failed: {str(e)}")
-            if self.logger.verbose:
-                self.logger.debug(f"Command output: {e.stdout}")
-                self.logger.debug(f"Command error: {e.stderr}")
-                self.logger.debug(f"Return code: {e.returncode}")
+            self.logger.error("❌ Script execution failed: %s", e)
+            self.logger.debug("Command output: %s", e.stdout)
+            self.logger.debug("Command error: %s", e.stderr)
+            self.logger.debug("Return code: %s", e.returncode)
             return False
         except Exception as e:
-            self.logger.error(f"❌ Unexpected error during route configuration: {str(e)}")
-            if self.logger.verbose:
-                self.logger.debug(f"Error details: {str(e)}")
+            self.logger.error("❌ Unexpected error during route configuration: %s", e)
+            self.logger.debug("Error details: %s", e)
             return False
 
 class RouteConfigurator:
@@ -116,7 +260,14 @@ class RouteConfigurator:
         """
         self.logger = logger
         self.interface = interface
+        # Keys of successfully configured routes (see make_route_key)
         self.seen_routes = set()
+        # (base prefix, is_prefix) of every successful configuration, any router
+        self._configured_prefixes: set[tuple[str, bool]] = set()
+        # Non-ULA prefixes already reported, oldest first, so each is only
+        # logged once; capped so a noisy link cannot grow it without bound
+        self._ignored_seen: OrderedDict[str, None] = OrderedDict()
+        self._ignored_max = 1024
         self.executor = RouteExecutor(logger, interface)
         
     def is_configured(self, prefix: str, prefix_len: int, is_prefix: bool = False) -> bool:
@@ -130,10 +281,7 @@ class RouteConfigurator:
         Returns:
             bool: True if the route is already configured, False otherwise
         """
-        # Create a Route object to get the route key
-        route = Route(prefix, None, self.interface, is_prefix)
-        route_key = route.get_route_key()
-        return route_key in self.seen_routes
+        return (prefix.partition("/")[0], is_prefix) in self._configured_prefixes
         
     def configure(self, prefix: str, prefix_len: int, router: str = None, is_prefix: bool = False) -> None:
         """Configure a route for the given prefix.
@@ -144,20 +292,26 @@ class RouteConfigurator:
             router: Router address (optional)
             is_prefix: Whether this is a prefix (on-link) or route (off-link)
         """
-        # Create a Route object
-        route = Route(prefix, router, self.interface, is_prefix)
-        
-        # Skip if we've seen this route before
-        route_key = route.get_route_key()
+        # Skip if we've seen this route before, without building a Route for it
+        route_key = make_route_key(prefix, router, self.interface, is_prefix)
         if route_key in self.seen_routes:
-            self.logger.debug(f"⏭️  {'Prefix' if is_prefix else 'Route'} already configured: {prefix}/{prefix_len}")
+            self.logger.debug(
+                "⏭️  %s already configured: %s/%s",
+                "Prefix" if is_prefix else "Route",
+                prefix,
+                prefix_len,
+            )
             return
             
-        self.logger.info(f"🔧 Configuring {'prefix' if is_prefix else 'route'} for {prefix}/{prefix_len}")
+        self.logger.info(
+            "🔧 Configuring %s for %s/%s", "prefix" if is_prefix else "route", prefix, prefix_len
+        )
         
         # Execute the route configuration
+        route = Route(prefix, router, self.interface, is_prefix)
         if self.executor.execute(route, prefix_len):
             self.seen_routes.add(route_key)
+            self._configured_prefixes.add((route_key[0], is_prefix))
 
     def get_route_key(self, prefix: str, router: str = None) -> str:
         """Generate a unique key for a route.
@@ -186,22 +340,31 @@ class RouteConfigurator:
         """
         src_ip = packet_info["src_ip"]
         
-        # Process prefix if present
-        if "prefix" in packet_info:
-            prefix_info = packet_info["prefix"]
-            prefix = prefix_info["address"]
-            prefix_len = prefix_info["length"]
-            
-            # Only configure ULA prefixes
-            if prefix.startswith("fd"):
-                self.configure(prefix, prefix_len, router=src_ip, is_prefix=True)
-        
-        # Process route if present
-        if "route" in packet_info:
-            route_info = packet_info["route"]
-            route = route_info["address"]
-            route_len = route_info["length"]
-            
-            # Only configure ULA routes
-            if route.startswith("fd"):
-                self.configure(route, route_len, router=src_ip, is_prefix=False) 
\ No newline at end of file
+        # On-link prefix first, then off-link route; only ULA entries are configured
+        for key, is_prefix in (("prefix", True), ("route", False)):
+            info = packet_info.get(key)
+            if info is None:
+                continue
+            # The parser classifies the prefix from the bytes it already holds
+            ula = info.get("ula")
+            if ula is None:
+                ula = is_ula_prefix(info["address"])
+            if not ula:
+                self._report_ignored(info["address"], info["length"])
+                continue
+            self.configure(info["address"], info["length"], router=src_ip, is_prefix=is_prefix)
+
+    def _report_ignored(self, prefix: str, prefix_len: int) -> None:
+        """Log a skipped non-ULA prefix the first time it is seen.
+        
+        Args:
+            prefix: The ignored IPv6 prefix
+            prefix_len: Prefix length
+        """
+        # ignored_route() only logs in verbose mode, so there is nothing to track otherwise
+        if not self.logger.verbose or prefix in self._ignored_seen:
+            return
+        self._ignored_seen[prefix] = None
+        if len(self._ignored_seen) > self._ignored_max:
+            self._ignored_seen.popitem(last=False)
+        self.logger.ignored_route(prefix, prefix_len, "not a ULA prefix (only fd00::/8 is configured)")
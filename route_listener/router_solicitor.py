@@ -1,6 +1,20 @@
 """Router Solicitation message handling."""
 
-from scapy.all import IPv6, ICMPv6ND_RS, ICMPv6NDOptSrcLLAddr, Ether, sendp
+import logging
+import socket
+import struct
+from scapy.all import IPv6, ICMPv6ND_RS, ICMPv6NDOptSrcLLAddr, Ether, sendp, get_if_hwaddr
+
+ALL_ROUTERS = "ff02::2"
+ND_ROUTER_SOLICIT = 133
+ND_OPT_SOURCE_LINKADDR = 1
+
+# Neighbor Discovery messages must be sent with a hop limit of 255 (RFC 4861)
+ND_HOP_LIMIT = 255
+
+# Host solicitation limits from RFC 4861 section 10: at most three RSs, 4 s apart
+MAX_RTR_SOLICITATIONS = 3
+RTR_SOLICITATION_INTERVAL = 4.0
 
 class RouterSolicitor:
     """Handles sending Router Solicitation messages."""
@@ -14,26 +28,86 @@ class RouterSolicitor:
         """
         self.interface = interface
         self.logger = logger
+        self._rs_frame = None
+        # Raw ICMPv6 socket, cached RS message and destination, set up on first send
+        self._rs_sock = None
+        self._rs_bytes = None
+        self._rs_dest = None
+
+    def _open_socket(self):
+        """Open a raw ICMPv6 socket and build the RS message sent on it.
+        
+        The kernel fills in the IPv6 header, source address and checksum, so
+        only the ICMPv6 message itself is cached.
+        
+        Raises:
+            OSError: If the socket cannot be opened or bound to the interface
+                (e.g. missing CAP_NET_RAW) or the interface does not exist
+        """
+        if_index = socket.if_nametoindex(self.interface)
+        mac = bytes.fromhex(get_if_hwaddr(self.interface).replace(":", ""))
+        sock = socket.socket(socket.AF_INET6, socket.SOCK_RAW, socket.IPPROTO_ICMPV6)
+        try:
+            # Keep the socket on this interface in the kernel, for routing and
+            # for anything it might receive
+            sock.setsockopt(
+                socket.SOL_SOCKET, socket.SO_BINDTODEVICE, self.interface.encode() + b"\0"
+            )
+            sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_MULTICAST_HOPS, ND_HOP_LIMIT)
+            sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_MULTICAST_IF, if_index)
+        except OSError:
+            sock.close()
+            raise
+        # RS header (type, code, checksum, reserved) plus a source link-layer address option
+        self._rs_bytes = (
+            struct.pack("!BBHI", ND_ROUTER_SOLICIT, 0, 0, 0)
+            + struct.pack("!BB", ND_OPT_SOURCE_LINKADDR, 1)
+            + mac
+        )
+        self._rs_dest = (ALL_ROUTERS, 0, 0, if_index)
+        self._rs_sock = sock
+
+    def _build_solicitation(self):
+        """Build the Router Solicitation frame.
+        
+        Returns:
+            The Ether/IPv6/ICMPv6ND_RS frame with a source link-layer address option
+        """
+        return Ether()/IPv6(dst="ff02::2")/ICMPv6ND_RS()/ICMPv6NDOptSrcLLAddr()
 
     def send_solicitation(self):
         """Send a Router Solicitation message."""
         try:
-            # Create the Router Solicitation packet
-            rs = IPv6(dst="ff02::2")/ICMPv6ND_RS()
-            
-            # Add source link-layer address option
-            rs = rs/ICMPv6NDOptSrcLLAddr()
+            # The message never changes, so build it once and reuse it; use a
+            # raw ICMPv6 socket where possible and Scapy otherwise
+            if self._rs_sock is None and self._rs_frame is None:
+                try:
+                    self._open_socket()
+                except OSError as e:
+                    if self.logger:
+                        self.logger.debug("Raw ICMPv6 socket unavailable (%s), using Scapy", e)
+                    self._rs_frame = self._build_solicitation()
             
             # Send the packet
-            if self.logger and self.logger.verbose:
+            if self.logger and self.logger.isEnabledFor(logging.DEBUG):
                 self.logger.debug("📤 Sending Router Solicitation")
-                self.logger.debug(f"🔍 RS packet: {rs.show()}")
+                if self._rs_frame is not None:
+                    self.logger.debug("🔍 RS packet: %s", self._rs_frame.show(dump=True))
             
-            sendp(Ether()/rs, iface=self.interface, verbose=0)
+            if self._rs_sock is not None:
+                self._rs_sock.sendto(self._rs_bytes, self._rs_dest)
+            else:
+                sendp(self._rs_frame, iface=self.interface, verbose=0)
             
             if self.logger and self.logger.verbose:
                 self.logger.info("📤 Router Solicitation sent")
                 
         except Exception as e:
             if self.logger:
-                self.logger.error(f"❌ Error sending Router Solicitation: {str(e)}") 
\ No newline at end of file
+                self.logger.error("❌ Error sending Router Solicitation: %s", e) 
+
+    def close(self):
+        """Close the raw ICMPv6 socket; the next solicitation reopens it."""
+        if self._rs_sock is not None:
+            self._rs_sock.close()
+            self._rs_sock = None
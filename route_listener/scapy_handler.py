@@ -1,10 +1,20 @@
 """Scapy packet handling for IPv6 Router Advertisements."""
 
-from scapy.all import sniff, IPv6, ICMPv6ND_RA
+import selectors
+import socket
+import threading
+import time
+from collections import OrderedDict
+from scapy.all import AsyncSniffer, IPv6, ICMPv6ND_RA
+from scapy.packet import Packet
 from .route_configurator import RouteConfigurator
-from .logger import Logger
-from .packet_parser import PacketParser
-from .router_solicitor import RouterSolicitor
+from .logger import Logger, Lazy
+from .packet_parser import PacketParser, ICMPV6_OFFSET
+from .router_solicitor import RouterSolicitor, MAX_RTR_SOLICITATIONS, RTR_SOLICITATION_INTERVAL
+from .packet_socket import PacketSocket, RCVBUF_SIZE
+
+# Kernel-side capture filter: ICMPv6 type 134 (Router Advertisement) only
+RA_FILTER = "icmp6 and ip6[40] = 134"
 
 class ScapyPacketHandler:
     """Handles IPv6 Router Advertisement packets using Scapy."""
@@ -29,48 +39,184 @@ class ScapyPacketHandler:
         self.logger = logger
         self.packet_parser = PacketParser()
         self.router_solicitor = RouterSolicitor(interface, logger) if enable_rs else None
+        self.sniffer: AsyncSniffer | None = None
+        self.packet_socket: PacketSocket | None = None
+        # Set by stop() and cleared once start() has returned, so a stop()
+        # that arrives before capture begins is not lost
+        self._stop_event = threading.Event()
+        # Socket pair written by stop() to wake the receive loop's selector
+        self._wakeup: tuple[socket.socket, socket.socket] | None = None
+        # Last time (monotonic ns) each (source, RA message) pair was processed,
+        # oldest first; a router repeating itself is skipped, a changed RA is not
+        self.last_processed: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+        self._dedup_window_ns = 1_000_000_000
+        # Caps (source, RA message) entries, not routers: a router whose RA
+        # changes takes one entry per version, each holding the full message
+        self._dedup_max_entries = 1024
+    
+    def start(self) -> None:
+        """Start listening for Router Advertisements until stop() is called.
+        
+        A stop() issued before or while starting up is honoured: start()
+        then returns as soon as capture would have begun.
+        """
+        self.logger.info("🎧 Starting to listen for Router Advertisements on %s", self.interface)
+        
+        try:
+            packet_socket: PacketSocket | None = PacketSocket(self.interface)
+        except OSError as e:
+            # No AF_PACKET/recvmmsg here (or not permitted); fall back to libpcap
+            self.logger.warning("⚠️  Batched capture unavailable (%s), using Scapy sniffer", e)
+            packet_socket = None
+        
+        # Router Solicitations go out only once capture is running, so the
+        # routers' immediate replies cannot be missed
+        wakeup = None
+        try:
+            if packet_socket is None:
+                self._sniff()
+            else:
+                if packet_socket.rcvbuf_capped:
+                    self.logger.warning(
+                        "⚠️  Receive buffer capped at %s bytes; raise net.core.rmem_max to %s",
+                        packet_socket.rcvbuf_size,
+                        RCVBUF_SIZE,
+                    )
+                self.packet_socket = packet_socket
+                wakeup = self._wakeup = socket.socketpair()
+                self._receive_batches(packet_socket, wakeup[0])
+        finally:
+            # Release every socket so start() can be called again after stop()
+            if packet_socket is not None:
+                packet_socket.close()
+                self.packet_socket = None
+            if wakeup is not None:
+                for sock in wakeup:
+                    sock.close()
+                self._wakeup = None
+            if self.router_solicitor:
+                self.router_solicitor.close()
+            # The stop has been served; a later one is for the next start()
+            self._stop_event.clear()
+    
+    def stop(self) -> None:
+        """Stop listening, unblocking a pending start() immediately."""
+        self._stop_event.set()
+        wakeup = self._wakeup
+        if wakeup is not None:
+            try:
+                wakeup[1].send(b"\0")
+            except OSError:
+                pass  # start() already closed it on its way out
+        sniffer = self.sniffer
+        if sniffer is not None and sniffer.running:
+            sniffer.stop()
     
-    def start(self):
-        """Start listening for Router Advertisements."""
-        self.logger.info(f"🎧 Starting to listen for Router Advertisements on {self.interface}")
+    def _receive_batches(self, packet_socket: PacketSocket, wakeup: socket.socket) -> None:
+        """Receive frames in batches from the packet socket until stopped.
         
-        # Send Router Solicitation if enabled
-        if self.router_solicitor:
-            self.router_solicitor.send_solicitation()
+        Waits on a selector for either queued frames or a wakeup from stop(),
+        then drains the socket without blocking. Router Solicitations are
+        sent from this same loop on a monotonic deadline, up to
+        MAX_RTR_SOLICITATIONS of them, until the first RA arrives.
         
-        # Start sniffing for Router Advertisements
-        sniff(
+        Args:
+            packet_socket: Socket to receive Router Advertisement frames from
+            wakeup: Socket that becomes readable when stop() is called
+        """
+        solicitor = self.router_solicitor
+        solicitations_left = MAX_RTR_SOLICITATIONS if solicitor else 0
+        next_solicitation = time.monotonic()
+        with selectors.DefaultSelector() as selector:
+            selector.register(packet_socket, selectors.EVENT_READ)
+            selector.register(wakeup, selectors.EVENT_READ)
+            while not self._stop_event.is_set():
+                timeout = None
+                if solicitor is not None and solicitations_left:
+                    timeout = next_solicitation - time.monotonic()
+                    if timeout <= 0:
+                        solicitor.send_solicitation()
+                        solicitations_left -= 1
+                        next_solicitation += RTR_SOLICITATION_INTERVAL
+                        timeout = RTR_SOLICITATION_INTERVAL if solicitations_left else None
+                
+                for key, _ in selector.select(timeout):
+                    # The kernel filter only queues RAs, so a router has answered
+                    if key.fileobj is packet_socket and self._drain(packet_socket):
+                        solicitations_left = 0
+    
+    def _drain(self, packet_socket: PacketSocket) -> int:
+        """Handle every frame queued on the packet socket, batch by batch.
+        
+        Keeps reading while batches come back full, so a burst is consumed
+        without going back to the selector after each batch.
+        
+        Args:
+            packet_socket: Socket to read the queued frames from
+        
+        Returns:
+            int: Number of frames handled
+        """
+        handled = 0
+        while True:
+            frames = packet_socket.recv_batch()
+            for frame in frames:
+                self._handle_frame(frame)
+            handled += len(frames)
+            if len(frames) < packet_socket.batch_size:
+                return handled
+    
+    def _sniff(self) -> None:
+        """Capture Router Advertisements with Scapy's sniffer and wait for it.
+        
+        Only a single Router Solicitation is sent here, once the sniffer has
+        started, rather than the MAX_RTR_SOLICITATIONS schedule of the
+        packet socket path.
+        """
+        if self._stop_event.is_set():
+            return
+        solicitor = self.router_solicitor
+        sniffer = self.sniffer = AsyncSniffer(
             iface=self.interface,
-            filter="icmp6 and ip6[40] = 134",  # ICMPv6 Router Advertisement
+            filter=RA_FILTER,
             prn=self._handle_packet,
-            store=0
+            store=0,
+            started_callback=solicitor.send_solicitation if solicitor else None
         )
+        sniffer.start()
+        sniffer.join()
     
-    def _handle_packet(self, packet):
+    def _handle_packet(self, packet: Packet) -> None:
         """Handle a received packet.
         
         Args:
             packet: Scapy packet object
         """
         try:
-            # Check if it's an IPv6 packet
-            if not packet.haslayer(IPv6):
-                if self.logger.verbose:
-                    self.logger.debug("Ignoring non-IPv6 packet")
+            # Look each layer up once and hand them to the parser
+            ipv6 = packet.getlayer(IPv6)
+            if ipv6 is None:
+                self.logger.debug("Ignoring non-IPv6 packet")
                 return
             
-            # Check if it's a Router Advertisement
-            if not packet.haslayer(ICMPv6ND_RA):
-                if self.logger.verbose:
-                    self.logger.debug("Ignoring non-RA packet")
+            # The capture filter only passes RAs; this is a defensive check
+            ra = packet.getlayer(ICMPv6ND_RA)
+            if ra is None:
+                self.logger.debug("Ignoring non-RA packet")
                 return
             
-            # Log packet details in verbose mode
-            if self.logger.verbose:
-                self.logger.debug(f"Received RA packet: {packet.summary()}")
+            # Skip repeats from the same router within the dedup window
+            # Captured layers keep their wire bytes; only built packets serialize
+            src_addr = ipv6.src
+            if self._is_duplicate(src_addr, ra.original or bytes(ra)):
+                self.logger.debug("Ignoring duplicate RA from %s", src_addr)
+                return
+            
+            # The summary is only built if the message is emitted
+            self.logger.debug("Received RA packet: %s", Lazy(packet.summary))
             
             # Parse the packet
-            packet_info = self.packet_parser.parse(packet)
+            packet_info = self.packet_parser.parse(packet, ra, src_addr)
             
             # Process the packet info
             self.route_configurator.process_packet_info(packet_info)
@@ -79,6 +225,66 @@ class ScapyPacketHandler:
             self.logger.debug("✅ Processed Router Advertisement")
             
         except Exception as e:
-            self.logger.error(f"❌ Error processing packet: {str(e)}")
-            if self.logger.verbose:
-                self.logger.debug(f"Packet details: {packet.summary()}") 
\ No newline at end of file
+            self._log_exc("Error processing packet", e)
+
+    def _handle_frame(self, frame: bytes | memoryview) -> None:
+        """Handle a raw Ethernet frame from the packet socket.
+        
+        Args:
+            frame: Received frame as bytes or a memoryview that is only valid
+                for the duration of this call
+        """
+        try:
+            located = self.packet_parser.ra_source(frame)
+            if located is None:
+                self.logger.debug("Ignoring non-RA frame")
+                return
+            src_addr, ra_end = located
+            
+            # Skip repeats from the same router within the dedup window
+            if self._is_duplicate(src_addr, bytes(frame[ICMPV6_OFFSET:ra_end])):
+                self.logger.debug("Ignoring duplicate RA from %s", src_addr)
+                return
+            
+            # Decode the options straight from the frame bytes
+            packet_info = self.packet_parser.parse_frame(frame, located)
+            self.route_configurator.process_packet_info(packet_info)
+            self.logger.debug("✅ Processed Router Advertisement")
+            
+        except Exception as e:
+            self._log_exc("Error processing frame", e)
+
+    def _is_duplicate(self, src_addr: str, ra_bytes: bytes) -> bool:
+        """Check whether this exact RA from this source was processed very recently.
+        
+        Records the current time for the RA when it is not a duplicate and,
+        once the table is full, evicts the (source, RA) entry whose last
+        processing is oldest.
+        
+        Args:
+            src_addr: Source address of the Router Advertisement
+            ra_bytes: The ICMPv6 RA message, header and options
+            
+        Returns:
+            bool: True if the RA falls within the dedup window, False otherwise
+        """
+        now = time.monotonic_ns()
+        key = (src_addr, ra_bytes)
+        last = self.last_processed.get(key)
+        if last is not None and now - last < self._dedup_window_ns:
+            return True
+        self.last_processed[key] = now
+        self.last_processed.move_to_end(key)
+        if len(self.last_processed) > self._dedup_max_entries:
+            self.last_processed.popitem(last=False)
+        return False
+
+    def _log_exc(self, where: str, e: Exception) -> None:
+        """Log an exception raised while handling packets.
+        
+        Args:
+            where: Short description of what was being done
+            e: The exception that was raised
+        """
+        self.logger.error("❌ %s: %s", where, e)
+        self.logger.debug("  type=%s", type(e).__name__) 
\ No newline at end of file
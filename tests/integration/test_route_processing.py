@@ -113,8 +113,12 @@ def test_process_ra_with_prefix_and_route(packet_parser, route_configurator, moc
     assert not route_obj.is_prefix
 
     # Verify logging
-    mock_logger.info.assert_any_call(f"🔧 Configuring prefix for {ra_data['prefix']['address']}/{ra_data['prefix']['length']}")
-    mock_logger.info.assert_any_call(f"🔧 Configuring route for {ra_data['route']['address']}/{ra_data['route']['length']}")
+    mock_logger.info.assert_any_call(
+        "🔧 Configuring %s for %s/%s", "prefix", ra_data["prefix"]["address"], ra_data["prefix"]["length"]
+    )
+    mock_logger.info.assert_any_call(
+        "🔧 Configuring %s for %s/%s", "route", ra_data["route"]["address"], ra_data["route"]["length"]
+    )
 
 def test_process_ra_with_non_ula_prefix(packet_parser, route_configurator, mock_logger, mock_executor):
     """Test processing of a Router Advertisement with non-ULA prefix."""
@@ -0,0 +1,16 @@
+"""Tests for logging helpers."""
+
+from unittest.mock import Mock
+
+from route_listener.logger import Lazy
+
+
+def test_lazy_argument_only_evaluated_when_formatted():
+    """Test that a lazy log argument calls its function only when formatted."""
+    func = Mock(return_value="dump")
+
+    lazy = Lazy(func, dump=True)
+    func.assert_not_called()
+
+    assert f"data: {lazy}" == "data: dump"
+    func.assert_called_once_with(dump=True)
@@ -43,6 +43,7 @@ def test_ignore_non_ipv6_packet(packet_handler, mock_logger):
     """Test that non-IPv6 packets are ignored and logged in verbose mode."""
     non_ipv6_packet = Mock()
     non_ipv6_packet.__iter__ = Mock(return_value=iter([]))
+    non_ipv6_packet.getlayer = Mock(return_value=None)
     packet_handler._handle_packet(non_ipv6_packet)
     # Verify that debug logging occurred
     mock_logger.debug.assert_called()
@@ -2,7 +2,7 @@
 
 import pytest
 from unittest.mock import Mock, MagicMock
-from scapy.all import IPv6, ICMPv6ND_RA, ICMPv6NDOptPrefixInfo, ICMPv6NDOptRouteInfo, ICMPv6NDOptSrcLLAddr, Ether
+from scapy.all import IPv6, ICMPv6ND_RA, ICMPv6NDOptPrefixInfo, ICMPv6NDOptRouteInfo, ICMPv6NDOptSrcLLAddr, Ether, Raw
 from route_listener.packet_parser import PacketParser
 
 @pytest.fixture
@@ -99,4 +99,75 @@ def test_parse_ra_with_missing_options(packet_parser):
     # Verify only source IP is present
     assert packet_info["src_ip"] == "fe80::92ea:32ff:fea1:fac"
     assert "prefix" not in packet_info
-    assert "route" not in packet_info 
\ No newline at end of file
+    assert "route" not in packet_info 
+
+def test_parse_frame_matches_scapy_parse(packet_parser):
+    """Test that the raw and Scapy parsers agree for built and captured packets."""
+    ra_packet = (
+        Ether(src="94:ea:32:a1:0f:ac") /
+        IPv6(src="fe80::92ea:32ff:fea1:fac", dst="ff02::1") /
+        ICMPv6ND_RA() /
+        ICMPv6NDOptSrcLLAddr(lladdr="94:ea:32:a1:0f:ac") /
+        ICMPv6NDOptPrefixInfo(
+            prefix="fd82:cd32:5ad7:ff4a::",
+            prefixlen=64,
+            validlifetime=1800,
+            preferredlifetime=900
+        ) /
+        ICMPv6NDOptRouteInfo(
+            prefix="fd4e:a053:febd::",
+            plen=48,
+            rtlifetime=1800
+        )
+    )
+    frame = bytes(ra_packet)
+    # A built packet is parsed layer by layer, a dissected one from its bytes
+    expected = packet_parser.parse(ra_packet)
+    
+    assert packet_parser.parse(Ether(frame)) == expected
+    assert packet_parser.parse_frame(frame) == expected
+    assert packet_parser.parse_frame(memoryview(frame)) == expected
+    assert expected["prefix"]["ula"] and expected["route"]["ula"]
+
+def test_parse_frame_rejects_zero_length_option(packet_parser):
+    """Test that an option with a zero length is treated as malformed."""
+    frame = bytes(
+        Ether() /
+        IPv6(src="fe80::1", dst="ff02::1") /
+        ICMPv6ND_RA() /
+        Raw(bytes([3, 0]) + bytes(30))
+    )
+    
+    with pytest.raises(ValueError):
+        packet_parser.parse_frame(frame)
+
+def test_parse_with_layers_from_caller(packet_parser):
+    """Test that layers passed in by the caller are used without looking them up again."""
+    ra_packet = (
+        IPv6(src="fe80::1", dst="ff02::1") /
+        ICMPv6ND_RA() /
+        ICMPv6NDOptPrefixInfo(prefix="fd82:cd32:5ad7:ff4a::", prefixlen=64)
+    )
+    packet = Mock()
+    
+    packet_info = packet_parser.parse(packet, ra_packet[ICMPv6ND_RA], "fe80::1")
+    
+    packet.getlayer.assert_not_called()
+    assert packet_info["src_ip"] == "fe80::1"
+    assert packet_info["prefix"]["address"] == "fd82:cd32:5ad7:ff4a::"
+
+def test_parse_frame_ignores_trailer_after_payload(packet_parser):
+    """Test that bytes past the IPv6 payload length are not parsed as options."""
+    ra_packet = (
+        Ether() /
+        IPv6(src="fe80::1", dst="ff02::1") /
+        ICMPv6ND_RA() /
+        ICMPv6NDOptPrefixInfo(prefix="fd82:cd32:5ad7:ff4a::", prefixlen=64)
+    )
+    # Ethernet padding or an FCS left on the frame
+    frame = bytes(ra_packet) + bytes.fromhex("dead beef")
+    
+    packet_info = packet_parser.parse_frame(frame)
+    
+    assert packet_info == packet_parser.parse(Ether(frame))
+    assert packet_info["prefix"]["address"] == "fd82:cd32:5ad7:ff4a::"
@@ -0,0 +1,119 @@
+"""Tests for PacketSocket."""
+
+import errno
+import socket
+import struct
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from route_listener.packet_socket import (
+    ARPHRD_ETHER,
+    BPF_RA_FILTER,
+    ETH_P_IPV6,
+    RCVBUF_SIZE,
+    PacketSocket,
+)
+
+
+@pytest.fixture
+def mock_sock():
+    """Patch out the AF_PACKET socket so PacketSocket can be built unprivileged."""
+    sock = MagicMock()
+    sock.getsockopt.return_value = 2 * RCVBUF_SIZE
+    sock.getsockname.return_value = ("eth0", ETH_P_IPV6, 0, ARPHRD_ETHER, b"")
+    with patch("route_listener.packet_socket.socket.socket", return_value=sock):
+        yield sock
+
+def test_rcvbuf_not_capped(mock_sock):
+    """Test that a buffer granted in full is reported as not capped."""
+    # The kernel reports twice the requested size
+    mock_sock.getsockopt.return_value = 2 * 1048576
+
+    packet_socket = PacketSocket("eth0", rcvbuf_size=1048576)
+
+    assert not packet_socket.rcvbuf_capped
+    assert packet_socket.rcvbuf_size == 1048576
+
+def test_rcvbuf_capped_by_rmem_max(mock_sock):
+    """Test that a cap between half the request and the request is reported."""
+    # rmem_max=4194304 with 6291456 requested: the kernel reports 8388608
+    mock_sock.getsockopt.return_value = 8388608
+
+    packet_socket = PacketSocket("eth0", rcvbuf_size=6291456)
+
+    assert packet_socket.rcvbuf_capped
+    assert packet_socket.rcvbuf_size == 4194304
+
+def test_missing_af_packet_raises_oserror(monkeypatch):
+    """Test that a platform without AF_PACKET reports OSError."""
+    monkeypatch.delattr(socket, "AF_PACKET")
+
+    with pytest.raises(OSError):
+        PacketSocket("eth0")
+
+def test_missing_recvmmsg_raises_oserror(mock_sock):
+    """Test that a libc without recvmmsg reports OSError."""
+    with patch("route_listener.packet_socket.ctypes.CDLL", return_value=MagicMock(spec=[])):
+        with pytest.raises(OSError):
+            PacketSocket("eth0")
+
+def test_non_ethernet_interface_raises_oserror(mock_sock):
+    """Test that an interface without Ethernet framing is refused so libpcap takes over."""
+    # ARPHRD_NONE, as reported for tun and wireguard interfaces
+    mock_sock.getsockname.return_value = ("wg0", ETH_P_IPV6, 0, 0xFFFE, b"")
+
+    with pytest.raises(OSError):
+        PacketSocket("wg0")
+
+    mock_sock.close.assert_called_once()
+
+def test_recv_batch_slices_frames_by_length(mock_sock):
+    """Test that each received frame is its slot of the buffer cut to msg_len."""
+    packet_socket = PacketSocket("eth0", batch_size=4, frame_size=16)
+
+    def fake_recvmmsg(fd, msgs, vlen, flags, timeout):
+        assert flags == socket.MSG_DONTWAIT
+        for i, data in enumerate((b"first", b"second-frame")):
+            packet_socket._buffer[i * 16:i * 16 + len(data)] = data
+            msgs[i].msg_len = len(data)
+        return 2
+    packet_socket._recvmmsg = fake_recvmmsg
+
+    frames = packet_socket.recv_batch()
+
+    assert [bytes(frame) for frame in frames] == [b"first", b"second-frame"]
+    assert all(frame.readonly for frame in frames)
+
+@pytest.mark.parametrize("err", [errno.EINTR, errno.EAGAIN])
+def test_recv_batch_returns_empty_on_retryable_error(mock_sock, err):
+    """Test that an interrupted or empty receive returns no frames."""
+    packet_socket = PacketSocket("eth0")
+    packet_socket._recvmmsg = MagicMock(return_value=-1)
+
+    with patch("route_listener.packet_socket.ctypes.get_errno", return_value=err):
+        assert packet_socket.recv_batch() == []
+
+def test_recv_batch_raises_on_other_errors(mock_sock):
+    """Test that any other recvmmsg failure is raised as OSError."""
+    packet_socket = PacketSocket("eth0")
+    packet_socket._recvmmsg = MagicMock(return_value=-1)
+
+    with patch("route_listener.packet_socket.ctypes.get_errno", return_value=errno.EBADF):
+        with pytest.raises(OSError) as exc_info:
+            packet_socket.recv_batch()
+
+    assert exc_info.value.errno == errno.EBADF
+
+def test_ra_filter_program():
+    """Test that every failed check in the BPF filter jumps to the drop instruction."""
+    insns = list(struct.iter_unpack("HBBI", BPF_RA_FILTER))
+
+    assert len(insns) == 8
+    for i in (1, 3, 5):
+        code, jt, jf, _ = insns[i]
+        assert code == 0x15
+        assert jt == 0
+        assert i + 1 + jf == 7
+    assert insns[6] == (0x06, 0, 0, 0x40000)
+    assert insns[7] == (0x06, 0, 0, 0)
@@ -1,8 +1,9 @@
 """Tests for Router Advertisement processing."""
 
+import socket
 import pytest
-from unittest.mock import Mock, MagicMock
-from route_listener.route_configurator import RouteConfigurator, Route, RouteExecutor
+from unittest.mock import Mock, MagicMock, patch
+from route_listener.route_configurator import RouteConfigurator, Route, RouteExecutor, is_ula_prefix, is_ula_packed
 from route_listener.logger import Logger
 from route_listener.packet_parser import PacketParser
 
@@ -152,4 +153,115 @@ def test_route_configuration_failure(route_configurator, mock_executor):
     route_configurator.process_packet_info(ra_data)
     
     # Verify the routes were not added to seen_routes
-    assert len(route_configurator.seen_routes) == 0 
\ No newline at end of file
+    assert len(route_configurator.seen_routes) == 0 
+
+def test_is_ula_prefix():
+    """Test ULA detection on the parsed address rather than its spelling."""
+    assert is_ula_prefix("fd82:cd32:5ad7:ff4a::")
+    assert is_ula_prefix("FD4E:A053:FEBD::/64")
+    assert not is_ula_prefix("2406:e001:abcd:5600::")
+    assert not is_ula_prefix("fc00::")
+    assert not is_ula_prefix("fdxx::")
+    assert is_ula_packed(bytes([0xFD]) + bytes(15))
+    assert not is_ula_packed(bytes([0xFC]) + bytes(15))
+
+def test_executor_uses_netlink_when_available(mock_logger):
+    """Test that routes are installed over netlink without running the script."""
+    executor = RouteExecutor(mock_logger, interface="eth0")
+    executor.ipr = MagicMock()
+    
+    with patch("route_listener.route_configurator.socket.if_nametoindex", return_value=2), \
+            patch("route_listener.route_configurator.subprocess.run") as mock_run:
+        assert executor.execute(Route("fd4e:a053:febd::", "fe80::1", "eth0", False), 64)
+    
+    mock_run.assert_not_called()
+    executor.ipr.route.assert_called_once()
+    kwargs = executor.ipr.route.call_args[1]
+    assert kwargs["dst"] == "fd4e:a053:febd::/64"
+    assert kwargs["gateway"] == "fe80::1"
+    assert kwargs["oif"] == 2
+
+def test_executor_netlink_removes_other_prefix_lengths(mock_logger):
+    """Test that routes for the same prefix with another length are deleted over netlink."""
+    executor = RouteExecutor(mock_logger, interface="eth0")
+    executor.ipr = MagicMock()
+    routes = []
+    for dst, dst_len in (("fd4e:a053:febd::", 48), ("fd4e:a053:febd::", 64), ("fd00:1::", 48)):
+        msg = MagicMock()
+        msg.get_attr.return_value = dst
+        msg.__getitem__.return_value = dst_len
+        routes.append(msg)
+    executor.ipr.get_routes.return_value = routes
+    
+    with patch("route_listener.route_configurator.socket.if_nametoindex", return_value=2):
+        executor._execute_netlink(Route("fd4e:a053:febd::", "fe80::1", "eth0", False), 64)
+    
+    executor.ipr.get_routes.assert_called_once_with(family=socket.AF_INET6, oif=2)
+    calls = executor.ipr.route.call_args_list
+    assert [c[0][0] for c in calls] == ["del", "replace"]
+    assert calls[0][1]["dst"] == "fd4e:a053:febd::/48"
+    assert calls[1][1]["dst"] == "fd4e:a053:febd::/64"
+
+def test_executor_falls_back_to_script_on_netlink_error(mock_logger):
+    """Test that a netlink failure falls back to the configuration script."""
+    executor = RouteExecutor(mock_logger, interface="eth0")
+    executor.ipr = MagicMock()
+    
+    with patch("route_listener.route_configurator.socket.if_nametoindex", side_effect=OSError("no such device")), \
+            patch("route_listener.route_configurator.subprocess.run") as mock_run:
+        mock_run.return_value = MagicMock(returncode=0, stdout="ok", stderr="")
+        assert executor.execute(Route("fd4e:a053:febd::", "fe80::1", "eth0", False), 64)
+    
+    mock_run.assert_called_once()
+
+def test_non_ula_prefix_reported_once(route_configurator, mock_logger, mock_executor):
+    """Test that a repeated non-ULA prefix is only reported the first time."""
+    ra_data = TEST_RAS[1]
+    
+    route_configurator.process_packet_info(ra_data)
+    route_configurator.process_packet_info(ra_data)
+    
+    mock_executor.execute.assert_not_called()
+    mock_logger.ignored_route.assert_called_once()
+
+def test_ignored_prefixes_not_tracked_unless_verbose(route_configurator, mock_logger):
+    """Test that ignored prefixes are only remembered when they are logged."""
+    mock_logger.verbose = False
+    
+    route_configurator.process_packet_info(TEST_RAS[1])
+    
+    mock_logger.ignored_route.assert_not_called()
+    assert not route_configurator._ignored_seen
+
+def test_ignored_prefixes_are_capped(route_configurator):
+    """Test that the set of reported prefixes evicts the oldest entry when full."""
+    route_configurator._ignored_max = 2
+    
+    for prefix in ("2001:db8:1::", "2001:db8:2::", "2001:db8:3::"):
+        route_configurator._report_ignored(prefix, 64)
+    
+    assert list(route_configurator._ignored_seen) == ["2001:db8:2::", "2001:db8:3::"]
+
+def test_is_configured_after_successful_configuration(route_configurator):
+    """Test that a configured prefix is reported as configured regardless of router."""
+    ra_data = TEST_RAS[2]
+    prefix = ra_data["prefix"]["address"]
+    
+    assert not route_configurator.is_configured(prefix, 64, is_prefix=True)
+    route_configurator.process_packet_info(ra_data)
+    
+    assert route_configurator.is_configured(prefix, 64, is_prefix=True)
+    assert not route_configurator.is_configured(prefix, 64, is_prefix=False)
+
+def test_parser_ula_flag_skips_reparse(route_configurator, mock_executor):
+    """Test that the parser's ULA classification is used instead of re-parsing the prefix."""
+    ra_data = {
+        "src_ip": "fe80::1",
+        "prefix": {"address": "fd00:1::", "length": 64, "ula": True}
+    }
+    
+    with patch("route_listener.route_configurator.is_ula_prefix") as mock_is_ula:
+        route_configurator.process_packet_info(ra_data)
+    
+    mock_is_ula.assert_not_called()
+    mock_executor.execute.assert_called_once()
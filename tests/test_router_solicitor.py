@@ -0,0 +1,65 @@
+"""Tests for RouterSolicitor."""
+
+import socket
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from route_listener.logger import Logger
+from route_listener.router_solicitor import RouterSolicitor
+
+MODULE = "route_listener.router_solicitor"
+
+@pytest.fixture
+def mock_logger():
+    """Create a mock logger for testing."""
+    logger = MagicMock(spec=Logger)
+    logger.verbose = False
+    logger.isEnabledFor.return_value = False
+    return logger
+
+def test_solicitation_sent_on_cached_raw_socket(mock_logger):
+    """Test that the RS message is built once and reused on the raw ICMPv6 socket."""
+    solicitor = RouterSolicitor("eth0", mock_logger)
+    mock_sock = MagicMock()
+
+    with patch(f"{MODULE}.socket.if_nametoindex", return_value=2), \
+            patch(f"{MODULE}.get_if_hwaddr", return_value="94:ea:32:a1:0f:ac"), \
+            patch(f"{MODULE}.socket.socket", return_value=mock_sock) as mock_socket, \
+            patch(f"{MODULE}.sendp") as mock_sendp:
+        solicitor.send_solicitation()
+        solicitor.send_solicitation()
+
+    mock_socket.assert_called_once()
+    mock_sendp.assert_not_called()
+    assert mock_sock.sendto.call_count == 2
+    data, dest = mock_sock.sendto.call_args[0]
+    assert data == bytes.fromhex("8500000000000000" "0101" "94ea32a10fac")
+    assert dest == ("ff02::2", 0, 0, 2)
+    mock_sock.setsockopt.assert_any_call(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, b"eth0\0")
+
+def test_solicitation_falls_back_to_scapy(mock_logger):
+    """Test that Scapy is used when the raw ICMPv6 socket cannot be opened."""
+    solicitor = RouterSolicitor("eth0", mock_logger)
+
+    with patch(f"{MODULE}.socket.if_nametoindex", side_effect=OSError("no such device")), \
+            patch(f"{MODULE}.sendp") as mock_sendp:
+        solicitor.send_solicitation()
+
+    mock_sendp.assert_called_once()
+    assert mock_sendp.call_args[1]["iface"] == "eth0"
+    mock_logger.error.assert_not_called()
+
+def test_close_releases_socket_and_next_send_reopens(mock_logger):
+    """Test that close() releases the raw socket and a later send opens a new one."""
+    solicitor = RouterSolicitor("eth0", mock_logger)
+
+    with patch(f"{MODULE}.socket.if_nametoindex", return_value=2), \
+            patch(f"{MODULE}.get_if_hwaddr", return_value="94:ea:32:a1:0f:ac"), \
+            patch(f"{MODULE}.socket.socket") as mock_socket:
+        solicitor.send_solicitation()
+        solicitor.close()
+        solicitor.send_solicitation()
+
+    assert mock_socket.call_count == 2
+    mock_socket.return_value.close.assert_called_once()
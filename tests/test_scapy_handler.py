@@ -1,13 +1,18 @@
 """Tests for ScapyPacketHandler."""
 
+import logging
 import pytest
+import selectors
+import socket
+import threading
+import time
 from unittest.mock import Mock, patch, MagicMock
 from route_listener.scapy_handler import ScapyPacketHandler
 from route_listener.route_configurator import RouteConfigurator, Route
-from route_listener.logger import Logger
+from route_listener.logger import Logger, LOGGER_NAME
 from route_listener.packet_parser import PacketParser
 from route_listener.router_solicitor import RouterSolicitor
-from scapy.all import IPv6, ICMPv6ND_RA
+from scapy.all import Ether, IPv6, ICMPv6ND_RA, ICMPv6NDOptPrefixInfo, ICMPv6EchoRequest
 
 @pytest.fixture
 def mock_logger():
@@ -91,52 +96,68 @@ def test_handle_packet_error(scapy_handler, mock_logger):
     
     # Verify error was logged
     mock_logger.error.assert_called_once()
-    assert "Test error" in mock_logger.error.call_args[0][0]
+    message, *args = mock_logger.error.call_args[0]
+    assert "Test error" in message % tuple(args)
 
 def test_start_with_rs(scapy_handler, mock_logger):
     """Test starting the packet handler with Router Solicitation enabled."""
     # Create a mock router solicitor
     mock_solicitor = MagicMock(spec=RouterSolicitor)
-    mock_solicitor.send = MagicMock()
     scapy_handler.router_solicitor = mock_solicitor
     
-    # Mock sniff to avoid actual packet capture
-    with patch('route_listener.scapy_handler.sniff') as mock_sniff:
+    # Force the Scapy fallback and mock the sniffer to avoid actual packet capture
+    with patch('route_listener.scapy_handler.PacketSocket', side_effect=OSError("no AF_PACKET")), \
+            patch('route_listener.scapy_handler.AsyncSniffer') as mock_sniff:
         # Start the handler
         scapy_handler.start()
         
-        # Verify Router Solicitation was sent
-        mock_solicitor.send.assert_called_once()
-        
-        # Verify sniff was called with correct parameters
+        # Verify the sniffer was created with correct parameters and started
         mock_sniff.assert_called_once()
+        mock_sniff.return_value.start.assert_called_once()
         call_args = mock_sniff.call_args[1]
         assert call_args["iface"] == "lo0"
         assert call_args["filter"] == "icmp6 and ip6[40] = 134"
         assert call_args["store"] == 0
+        
+        # Verify Router Solicitation is sent once the sniffer has started
+        assert call_args["started_callback"] == mock_solicitor.send_solicitation
 
 def test_start_without_rs(scapy_handler, mock_logger):
     """Test starting the packet handler without Router Solicitation."""
     # Ensure Router Solicitation is disabled
     scapy_handler.router_solicitor = None
     
-    # Mock sniff to avoid actual packet capture
-    with patch('route_listener.scapy_handler.sniff') as mock_sniff:
+    # Force the Scapy fallback and mock the sniffer to avoid actual packet capture
+    with patch('route_listener.scapy_handler.PacketSocket', side_effect=OSError("no AF_PACKET")), \
+            patch('route_listener.scapy_handler.AsyncSniffer') as mock_sniff:
         # Start the handler
         scapy_handler.start()
         
-        # Verify sniff was called with correct parameters
+        # Verify the sniffer was created with correct parameters and started
         mock_sniff.assert_called_once()
+        mock_sniff.return_value.start.assert_called_once()
         call_args = mock_sniff.call_args[1]
         assert call_args["iface"] == "lo0"
         assert call_args["filter"] == "icmp6 and ip6[40] = 134"
         assert call_args["store"] == 0
+    
+    # The fallback is reported
+    mock_logger.warning.assert_called_once()
+
+def test_start_propagates_attribute_errors(scapy_handler):
+    """Test that a programming error in the packet socket is not mistaken for a fallback."""
+    with patch('route_listener.scapy_handler.PacketSocket', side_effect=AttributeError("typo")), \
+            patch('route_listener.scapy_handler.AsyncSniffer') as mock_sniff:
+        with pytest.raises(AttributeError):
+            scapy_handler.start()
+    
+    mock_sniff.assert_not_called()
 
 def test_ignore_non_ipv6_packet(scapy_handler, mock_logger):
     """Test that non-IPv6 packets are ignored and logged in verbose mode."""
     # Create a non-IPv6 packet
     non_ipv6_packet = Mock()
-    non_ipv6_packet.haslayer = Mock(return_value=False)
+    non_ipv6_packet.getlayer = Mock(return_value=None)
     
     # Process the packet
     scapy_handler._handle_packet(non_ipv6_packet)
@@ -148,7 +169,7 @@ def test_ignore_non_ra_packet(scapy_handler, mock_logger):
     """Test that non-RA packets are ignored and logged in verbose mode."""
     # Create an IPv6 packet without RA
     ipv6_packet = Mock()
-    ipv6_packet.haslayer = Mock(side_effect=lambda x: x == IPv6)
+    ipv6_packet.getlayer = Mock(side_effect=lambda x: Mock(src="fe80::1") if x == IPv6 else None)
     
     # Process the packet
     scapy_handler._handle_packet(ipv6_packet)
@@ -183,4 +204,227 @@ def test_process_valid_ra_packet(scapy_handler, mock_logger, mock_route_configur
     mock_logger.info.assert_called_with("✅ Processed Router Advertisement")
     
     # Verify packet was processed
-    mock_route_configurator.process_packet_info.assert_called_once()
\ No newline at end of file
+    mock_route_configurator.process_packet_info.assert_called_once()
+
+def test_duplicate_ra_within_window_is_skipped(scapy_handler, mock_route_configurator):
+    """Test that repeated RAs from one router are only processed once per window."""
+    ra_packet = IPv6(src="fe80::1", dst="ff02::1")/ICMPv6ND_RA()
+    scapy_handler.packet_parser.parse = Mock(return_value={"src_ip": "fe80::1"})
+    
+    with patch('route_listener.scapy_handler.time.monotonic_ns', side_effect=[0, 10, 2_000_000_000]):
+        scapy_handler._handle_packet(ra_packet)
+        scapy_handler._handle_packet(ra_packet)
+        scapy_handler._handle_packet(ra_packet)
+    
+    # The second RA is inside the window, the third is after it expired
+    assert mock_route_configurator.process_packet_info.call_count == 2
+
+def test_changed_ra_within_window_is_processed(scapy_handler, mock_route_configurator):
+    """Test that an RA whose contents changed is not treated as a duplicate."""
+    first = IPv6(src="fe80::1", dst="ff02::1")/ICMPv6ND_RA()/ICMPv6NDOptPrefixInfo(prefix="fd82::")
+    second = IPv6(src="fe80::1", dst="ff02::1")/ICMPv6ND_RA()/ICMPv6NDOptPrefixInfo(prefix="fd83::")
+    scapy_handler.packet_parser.parse = Mock(return_value={"src_ip": "fe80::1"})
+    
+    with patch('route_listener.scapy_handler.time.monotonic_ns', side_effect=[0, 10]):
+        scapy_handler._handle_packet(first)
+        scapy_handler._handle_packet(second)
+    
+    assert mock_route_configurator.process_packet_info.call_count == 2
+
+def test_stop_stops_running_sniffer(scapy_handler):
+    """Test that stop() halts an active capture."""
+    scapy_handler.sniffer = MagicMock(running=True)
+    
+    scapy_handler.stop()
+    
+    scapy_handler.sniffer.stop.assert_called_once()
+
+def test_start_receives_batches_from_packet_socket(scapy_handler):
+    """Test that frames from the batched packet socket reach the packet handler."""
+    frame = bytes(Ether()/IPv6(src="fe80::1", dst="ff02::1")/ICMPv6ND_RA())
+    # Back the mocked packet socket with a readable descriptor for the selector
+    readable, writer = socket.socketpair()
+    writer.send(b"x")
+    mock_socket = MagicMock(rcvbuf_capped=False, batch_size=64)
+    mock_socket.fileno.return_value = readable.fileno()
+    
+    def recv_batch():
+        scapy_handler.stop()
+        return [frame, frame]
+    mock_socket.recv_batch.side_effect = recv_batch
+    scapy_handler._handle_frame = Mock()
+    
+    with patch('route_listener.scapy_handler.PacketSocket', return_value=mock_socket), \
+            patch('route_listener.scapy_handler.AsyncSniffer') as mock_sniff:
+        scapy_handler.start()
+    
+    # Both frames of the batch are handled, the socket is closed, no sniffer is used
+    assert scapy_handler._handle_frame.call_count == 2
+    scapy_handler._handle_frame.assert_called_with(frame)
+    mock_socket.close.assert_called_once()
+    mock_sniff.assert_not_called()
+    readable.close()
+    writer.close()
+
+def test_start_warns_when_receive_buffer_is_capped(scapy_handler, mock_logger):
+    """Test that a receive buffer capped by net.core.rmem_max is reported."""
+    mock_socket = MagicMock(rcvbuf_capped=True, rcvbuf_size=212992)
+    
+    with patch('route_listener.scapy_handler.PacketSocket', return_value=mock_socket), \
+            patch.object(scapy_handler, '_receive_batches'):
+        scapy_handler.start()
+    
+    mock_logger.warning.assert_called_once()
+    assert "net.core.rmem_max" in mock_logger.warning.call_args[0][0]
+
+def test_handle_frame_parses_raw_ra(scapy_handler, mock_route_configurator):
+    """Test that a raw RA frame is parsed and handed to the route configurator."""
+    frame = bytes(
+        Ether()/IPv6(src="fe80::1", dst="ff02::1")/ICMPv6ND_RA()/
+        ICMPv6NDOptPrefixInfo(prefix="fd82:cd32:5ad7:ff4a::", prefixlen=64)
+    )
+    
+    with patch.object(scapy_handler.packet_parser, 'ra_source', wraps=scapy_handler.packet_parser.ra_source) as ra_source:
+        scapy_handler._handle_frame(frame)
+    
+    # The frame is only located once; parse_frame reuses the result
+    ra_source.assert_called_once()
+    packet_info = mock_route_configurator.process_packet_info.call_args[0][0]
+    assert packet_info["src_ip"] == "fe80::1"
+    assert packet_info["prefix"]["address"] == "fd82:cd32:5ad7:ff4a::"
+
+def test_handle_frame_ignores_non_ra(scapy_handler, mock_logger, mock_route_configurator):
+    """Test that raw frames other than RAs are ignored."""
+    scapy_handler._handle_frame(bytes(Ether()/IPv6()/ICMPv6EchoRequest()))
+    
+    mock_logger.debug.assert_called_with("Ignoring non-RA frame")
+    mock_route_configurator.process_packet_info.assert_not_called()
+
+@pytest.mark.parametrize("level, verbose, built", [
+    (logging.INFO, True, False),
+    (logging.DEBUG, False, False),
+    (logging.DEBUG, True, True),
+])
+def test_packet_summary_built_only_when_debug_enabled(scapy_handler, monkeypatch, caplog, level, verbose, built):
+    """Test that the packet summary is only built when the debug message is emitted."""
+    # Use the real logger without attaching the console and file handlers
+    monkeypatch.setattr("route_listener.logger._configured", True)
+    logging.disable(logging.NOTSET)
+    scapy_handler.logger = Logger(verbose=verbose)
+    ra_packet = MagicMock()
+    ra_packet.getlayer.return_value.src = "fe80::1"
+    scapy_handler.packet_parser.parse = Mock(return_value={"src_ip": "fe80::1"})
+    
+    with caplog.at_level(level, logger=LOGGER_NAME):
+        scapy_handler._handle_packet(ra_packet)
+    
+    assert ra_packet.summary.called == built
+    assert ("Received RA packet" in caplog.text) == built
+
+def test_stop_wakes_idle_receive_loop(scapy_handler):
+    """Test that stop() returns start() promptly even when no frames arrive."""
+    idle, peer = socket.socketpair()
+    mock_socket = MagicMock(rcvbuf_capped=False)
+    mock_socket.fileno.return_value = idle.fileno()
+    
+    with patch('route_listener.scapy_handler.PacketSocket', return_value=mock_socket):
+        listener = threading.Thread(target=scapy_handler.start)
+        listener.start()
+        while scapy_handler._wakeup is None and listener.is_alive():
+            time.sleep(0.01)
+        scapy_handler.stop()
+        listener.join(timeout=2)
+    
+    assert not listener.is_alive()
+    mock_socket.recv_batch.assert_not_called()
+    idle.close()
+    peer.close()
+
+def test_stop_before_start_is_honoured(scapy_handler):
+    """Test that a stop() issued before start() makes start() return at once."""
+    idle, peer = socket.socketpair()
+    mock_socket = MagicMock(rcvbuf_capped=False)
+    mock_socket.fileno.return_value = idle.fileno()
+    scapy_handler.stop()
+    
+    with patch('route_listener.scapy_handler.PacketSocket', return_value=mock_socket):
+        listener = threading.Thread(target=scapy_handler.start)
+        listener.start()
+        listener.join(timeout=2)
+    
+    assert not listener.is_alive()
+    mock_socket.close.assert_called_once()
+    # The stop was consumed by that run
+    assert not scapy_handler._stop_event.is_set()
+    idle.close()
+    peer.close()
+
+def test_fallback_sniffer_honours_early_stop_and_closes_solicitor(scapy_handler):
+    """Test that the Scapy fallback honours an early stop and releases the RS socket."""
+    mock_solicitor = MagicMock(spec=RouterSolicitor)
+    scapy_handler.router_solicitor = mock_solicitor
+    scapy_handler.stop()
+    
+    with patch('route_listener.scapy_handler.PacketSocket', side_effect=OSError("no AF_PACKET")), \
+            patch('route_listener.scapy_handler.AsyncSniffer') as mock_sniff:
+        scapy_handler.start()
+    
+    mock_sniff.assert_not_called()
+    mock_solicitor.close.assert_called_once()
+
+def test_solicitations_follow_capture_and_stop_on_first_ra(scapy_handler):
+    """Test that RSs are sent once capture is open and stop when an RA arrives."""
+    frame = bytes(Ether()/IPv6(src="fe80::1", dst="ff02::1")/ICMPv6ND_RA())
+    readable, writer = socket.socketpair()
+    events = []
+    mock_socket = MagicMock(rcvbuf_capped=False, batch_size=64)
+    mock_socket.fileno.return_value = readable.fileno()
+    mock_solicitor = MagicMock(spec=RouterSolicitor)
+    mock_solicitor.send_solicitation.side_effect = lambda: events.append("rs")
+    scapy_handler.router_solicitor = mock_solicitor
+    
+    def recv_batch():
+        readable.recv(1)
+        events.append("ra")
+        return [frame]
+    mock_socket.recv_batch.side_effect = recv_batch
+    
+    # Deliver the RA only after the first RS and stop on the second RS deadline
+    def select(selector_select):
+        def wrapped(timeout=None):
+            if events[-1] == "rs":
+                writer.send(b"x")
+            elif events[-1] == "ra":
+                scapy_handler.stop()
+            return selector_select(timeout)
+        return wrapped
+    
+    def create_socket(interface):
+        events.append("open")
+        return mock_socket
+    
+    real_selector = selectors.DefaultSelector
+    def selector_factory():
+        selector = real_selector()
+        selector.select = select(selector.select)
+        return selector
+    
+    # With no retransmit delay, any RS still pending after the RA would show up
+    with patch('route_listener.scapy_handler.PacketSocket', side_effect=create_socket), \
+            patch('route_listener.scapy_handler.selectors.DefaultSelector', side_effect=selector_factory), \
+            patch('route_listener.scapy_handler.RTR_SOLICITATION_INTERVAL', 0):
+        scapy_handler.start()
+    
+    assert events == ["open", "rs", "ra"]
+    readable.close()
+    writer.close()
+
+def test_drain_reads_until_batch_is_short(scapy_handler):
+    """Test that full batches are followed by another read before returning."""
+    packet_socket = MagicMock(batch_size=2)
+    packet_socket.recv_batch.side_effect = [[b"a", b"b"], [b"c", b"d"], [b"e"]]
+    scapy_handler._handle_frame = Mock()
+    
+    assert scapy_handler._drain(packet_socket) == 5
+    assert packet_socket.recv_batch.call_count == 3
+    assert scapy_handler._handle_frame.call_count == 5